@@ -2,28 +2,70 @@
 
 from __future__ import annotations
 
+import hashlib
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Iterator, Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import Connection, Engine, create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
 
 from models import Base
 
 
-# Direct connection using psycopg2 connect_args to avoid URL encoding issues
-engine = create_engine(
-    "postgresql+psycopg2://",
-    connect_args={
-        "host": "127.0.0.1",
-        "port": 5432,
-        "dbname": "Health and Fitness club",
-        "user": "postgres",
-        "password": "Saksan31!",
-    },
-    echo=False,
-    future=True,
-)
+# Direct connection using psycopg connect_args to avoid URL encoding issues
+_CONNECT_ARGS = {
+    "host": "127.0.0.1",
+    "port": 5432,
+    "dbname": "Health and Fitness club",
+    "user": "postgres",
+    "password": "Saksan31!",
+}
+
+# Server-side PREPARE a statement from its second execution onwards.
+_PREPARE_THRESHOLD = 1
+
+
+def make_engine(url: Optional[str] = None, **overrides: Any) -> Engine:
+    """Create an engine with the pool and cache settings the CLI relies on.
+
+    Without ``url`` it connects to the club database through ``_CONNECT_ARGS``;
+    a given URL is used as is, so scripts can point at another database.
+    Keyword arguments override the defaults, e.g. a smaller pool for scripts.
+
+    Primary keys are serial columns, so there are two ways to load many rows
+    without a sequence round trip per row:
+
+    * pre-assign ids from Python and ``setval`` the sequences afterwards, as
+      ``seed_data`` does for its deterministic demo rows;
+    * pass a list of dicts to ``session.execute(insert(Model).returning(...),
+      rows)`` and let insertmanyvalues fetch the generated ids for a whole
+      page (``insertmanyvalues_page_size``, 1000 by default) of rows per
+      statement; without ``returning`` the list is a plain driver executemany.
+    """
+    connect_args: dict[str, Any] = {"prepare_threshold": _PREPARE_THRESHOLD}
+    if url is None:
+        url = "postgresql+psycopg://"
+        connect_args.update(_CONNECT_ARGS)
+    options: dict[str, Any] = {
+        "connect_args": connect_args,
+        # Keep warm connections around between CLI actions; LIFO checkout reuses
+        # the most recently returned connection and pre_ping discards stale ones.
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+        # Room for every statement the CLI issues in its compiled-SQL cache.
+        "query_cache_size": 1200,
+        "echo": False,
+        "future": True,
+    }
+    options.update(overrides)
+    return create_engine(url, **options)
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
@@ -40,87 +82,284 @@ def get_session() -> Iterator[Session]:
         session.close()
 
 
+@contextmanager
+def get_readonly_conn() -> Iterator[Connection]:
+    """Provide a plain Core connection for actions that only read."""
+    with engine.connect() as conn:
+        yield conn
+
+
+def refresh_dashboard(session: Session) -> None:
+    """Refresh member_dashboard_mv inside the session's current transaction."""
+    session.flush()
+    session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY member_dashboard_mv"))
+
+
 def init_db() -> None:
     """Create tables for all models."""
     Base.metadata.create_all(engine)
     _ensure_db_extras()
 
 
+_EXTRAS_STATEMENTS = [
+    # Rebuilt below whenever the extras change so it tracks the view's columns.
+    "DROP MATERIALIZED VIEW IF EXISTS member_dashboard_mv;",
+    """
+    CREATE OR REPLACE VIEW member_dashboard_view AS
+    SELECT
+        m.member_id,
+        m.full_name,
+        m.email,
+        m.phone,
+        goal.goal_type,
+        goal.target_value,
+        goal.target_date,
+        metric.recorded_at AS latest_metric_at,
+        metric.weight_kg,
+        metric.heart_rate_bpm,
+        metric.body_fat_percent
+    FROM member m
+    LEFT JOIN LATERAL (
+        SELECT goal_type, target_value, target_date
+        FROM fitnessgoal
+        WHERE member_id = m.member_id AND is_active
+        ORDER BY target_date DESC, goal_id DESC
+        LIMIT 1
+    ) AS goal ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT recorded_at, weight_kg, heart_rate_bpm, body_fat_percent
+        FROM healthmetric
+        WHERE member_id = m.member_id
+        ORDER BY recorded_at DESC, metric_id DESC
+        LIMIT 1
+    ) AS metric ON TRUE;
+    """,
+    # Dashboard reads hit this snapshot instead of running the LATERALs; the
+    # unique index is what allows REFRESH ... CONCURRENTLY.
+    """
+    CREATE MATERIALIZED VIEW member_dashboard_mv AS
+    SELECT * FROM member_dashboard_view;
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_mdv_member
+    ON member_dashboard_mv (member_id);
+    """,
+    # fitnessclass.current_count replaces the old COUNT(*) capacity trigger:
+    # statement-level triggers keep it in step with every insert, update or
+    # delete on classregistration, and the CHECK turns an overbooking into an error.
+    "DROP TRIGGER IF EXISTS trg_check_class_capacity ON classregistration;",
+    "DROP FUNCTION IF EXISTS check_class_capacity();",
+    """
+    ALTER TABLE fitnessclass
+    ADD COLUMN IF NOT EXISTS current_count integer NOT NULL DEFAULT 0;
+    """,
+    """
+    UPDATE fitnessclass AS fc
+    SET current_count = counts.registered
+    FROM (
+        SELECT f.class_id, COUNT(cr.class_id) AS registered
+        FROM fitnessclass AS f
+        LEFT JOIN classregistration AS cr ON cr.class_id = f.class_id
+        GROUP BY f.class_id
+    ) AS counts
+    WHERE fc.class_id = counts.class_id
+      AND fc.current_count <> counts.registered;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sync_class_current_count()
+    RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE fitnessclass AS fc
+            SET current_count = fc.current_count + added.registered
+            FROM (
+                SELECT class_id, COUNT(*) AS registered
+                FROM new_registrations
+                GROUP BY class_id
+            ) AS added
+            WHERE fc.class_id = added.class_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE fitnessclass AS fc
+            SET current_count = fc.current_count - removed.registered
+            FROM (
+                SELECT class_id, COUNT(*) AS registered
+                FROM old_registrations
+                GROUP BY class_id
+            ) AS removed
+            WHERE fc.class_id = removed.class_id;
+        ELSE
+            -- Net change per class, so a class that both loses and gains rows
+            -- is updated once; updates that keep class_id net to zero.
+            UPDATE fitnessclass AS fc
+            SET current_count = fc.current_count + moved.registered
+            FROM (
+                SELECT class_id, SUM(change) AS registered
+                FROM (
+                    SELECT class_id, 1 AS change FROM new_registrations
+                    UNION ALL
+                    SELECT class_id, -1 AS change FROM old_registrations
+                ) AS changes
+                GROUP BY class_id
+                HAVING SUM(change) <> 0
+            ) AS moved
+            WHERE fc.class_id = moved.class_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    "DROP TRIGGER IF EXISTS trg_classregistration_count_insert ON classregistration;",
+    """
+    CREATE TRIGGER trg_classregistration_count_insert
+    AFTER INSERT ON classregistration
+    REFERENCING NEW TABLE AS new_registrations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_class_current_count();
+    """,
+    "DROP TRIGGER IF EXISTS trg_classregistration_count_delete ON classregistration;",
+    """
+    CREATE TRIGGER trg_classregistration_count_delete
+    AFTER DELETE ON classregistration
+    REFERENCING OLD TABLE AS old_registrations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_class_current_count();
+    """,
+    # Transition tables cannot be combined with UPDATE OF class_id, so this
+    # fires on every update and only acts on rows that changed class.
+    "DROP TRIGGER IF EXISTS trg_classregistration_count_update ON classregistration;",
+    """
+    CREATE TRIGGER trg_classregistration_count_update
+    AFTER UPDATE ON classregistration
+    REFERENCING OLD TABLE AS old_registrations NEW TABLE AS new_registrations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_class_current_count();
+    """,
+    """
+    ALTER TABLE fitnessclass
+    DROP CONSTRAINT IF EXISTS ck_fitnessclass_current_count;
+    """,
+    """
+    ALTER TABLE fitnessclass
+    ADD CONSTRAINT ck_fitnessclass_current_count
+    CHECK (current_count >= 0 AND current_count <= max_capacity) NOT VALID;
+    """,
+    # Declared in the models' __table_args__ as well; create_all only builds
+    # them for new tables, so existing databases pick them up here.
+    """
+    CREATE INDEX IF NOT EXISTS idx_fitnessclass_trainer_time
+    ON fitnessclass (trainer_id, start_time, end_time);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_start_time
+    ON ptsession (trainer_id, start_time);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_traineravailability_trainer_start
+    ON traineravailability (trainer_id, start_time);
+    """,
+    # The composite index above leads with trainer_id and replaces this one.
+    "DROP INDEX IF EXISTS ix_traineravailability_trainer_id;",
+    # Room lookups use the (room_id, during) GiST indexes further down.
+    "DROP INDEX IF EXISTS idx_fitnessclass_room_time;",
+    "DROP INDEX IF EXISTS idx_ptsession_room_time;",
+    # Foreign-key indexes declared with index=True on the models, for the same
+    # reason; the model's ix_ name supersedes the old hand-written one.
+    "DROP INDEX IF EXISTS idx_classregistration_class_id;",
+    """
+    CREATE INDEX IF NOT EXISTS ix_classregistration_class_id
+    ON classregistration (class_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_ptsession_member_id
+    ON ptsession (member_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_fitnessgoal_member_id
+    ON fitnessgoal (member_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_invoice_member_id
+    ON invoice (member_id);
+    """,
+    # Match the ORDER BY ... LIMIT 1 lookups in member_dashboard_view so each
+    # LATERAL is a single index probe instead of a scan and sort per member.
+    # sql/extras.sql used to create the first two without the tie-break column
+    # and without the partial predicate; these supersede them.
+    "DROP INDEX IF EXISTS idx_healthmetric_member_recorded;",
+    "DROP INDEX IF EXISTS idx_fitnessgoal_member_active;",
+    """
+    CREATE INDEX IF NOT EXISTS idx_healthmetric_member_recorded_id
+    ON healthmetric (member_id, recorded_at DESC, metric_id DESC);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_fitnessgoal_member_active_target
+    ON fitnessgoal (member_id, is_active, target_date DESC, goal_id DESC)
+    WHERE is_active;
+    """,
+    # Stored [start_time, end_time) ranges so overlap checks can use && against
+    # GiST indexes; btree_gist lets the owner id share the index.
+    "CREATE EXTENSION IF NOT EXISTS btree_gist;",
+    """
+    ALTER TABLE traineravailability ADD COLUMN IF NOT EXISTS during tsrange
+    GENERATED ALWAYS AS (tsrange(start_time, end_time)) STORED;
+    """,
+    """
+    ALTER TABLE fitnessclass ADD COLUMN IF NOT EXISTS during tsrange
+    GENERATED ALWAYS AS (tsrange(start_time, end_time)) STORED;
+    """,
+    """
+    ALTER TABLE ptsession ADD COLUMN IF NOT EXISTS during tsrange
+    GENERATED ALWAYS AS (tsrange(start_time, end_time)) STORED;
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_traineravailability_trainer_during
+    ON traineravailability USING gist (trainer_id, during);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_fitnessclass_trainer_during
+    ON fitnessclass USING gist (trainer_id, during);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_fitnessclass_room_during
+    ON fitnessclass USING gist (room_id, during);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_during
+    ON ptsession USING gist (trainer_id, during);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_ptsession_room_during
+    ON ptsession USING gist (room_id, during);
+    """,
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+    """
+    CREATE INDEX IF NOT EXISTS idx_member_fullname_trgm
+    ON member USING gin (full_name gin_trgm_ops);
+    """,
+]
+
+# Stamped onto the dashboard view once the statements above have run, so later
+# launches can skip them; editing any statement changes the stamp.
+_EXTRAS_VERSION = hashlib.sha1("\n".join(_EXTRAS_STATEMENTS).encode()).hexdigest()
+
+
+def _extras_installed(conn: Connection) -> bool:
+    """Return True when the current set of extras is already in the database."""
+    stamp = conn.execute(
+        text("SELECT obj_description(to_regclass('member_dashboard_view'), 'pg_class')")
+    ).scalar()
+    return stamp == _EXTRAS_VERSION
+
+
 def _ensure_db_extras() -> None:
-    """Create the required view, trigger, and indexes if they do not exist."""
-    statements = [
-        """
-        CREATE OR REPLACE VIEW member_dashboard_view AS
-        SELECT
-            m.member_id,
-            m.full_name,
-            m.email,
-            m.phone,
-            goal.goal_type,
-            goal.target_value,
-            goal.target_date,
-            metric.recorded_at AS latest_metric_at,
-            metric.weight_kg,
-            metric.heart_rate_bpm,
-            metric.body_fat_percent
-        FROM member m
-        LEFT JOIN LATERAL (
-            SELECT goal_type, target_value, target_date
-            FROM fitnessgoal
-            WHERE member_id = m.member_id AND is_active IS TRUE
-            ORDER BY target_date DESC, goal_id DESC
-            LIMIT 1
-        ) AS goal ON TRUE
-        LEFT JOIN LATERAL (
-            SELECT recorded_at, weight_kg, heart_rate_bpm, body_fat_percent
-            FROM healthmetric
-            WHERE member_id = m.member_id
-            ORDER BY recorded_at DESC, metric_id DESC
-            LIMIT 1
-        ) AS metric ON TRUE;
-        """,
-        """
-        CREATE OR REPLACE FUNCTION check_class_capacity()
-        RETURNS trigger AS $$
-        DECLARE
-            current_count integer;
-            capacity integer;
-        BEGIN
-            SELECT COUNT(*) INTO current_count
-            FROM classregistration
-            WHERE class_id = NEW.class_id;
-
-            SELECT max_capacity INTO capacity
-            FROM fitnessclass
-            WHERE class_id = NEW.class_id;
-
-            IF capacity IS NULL THEN
-                RAISE EXCEPTION 'Class % does not exist', NEW.class_id;
-            END IF;
-
-            IF current_count >= capacity THEN
-                RAISE EXCEPTION 'Class % is full', NEW.class_id;
-            END IF;
-            RETURN NEW;
-        END;
-        $$ LANGUAGE plpgsql;
-        """,
-        "DROP TRIGGER IF EXISTS trg_check_class_capacity ON classregistration;",
-        """
-        CREATE TRIGGER trg_check_class_capacity
-        BEFORE INSERT ON classregistration
-        FOR EACH ROW
-        EXECUTE FUNCTION check_class_capacity();
-        """,
-        """
-        CREATE INDEX IF NOT EXISTS idx_classregistration_class_id
-        ON classregistration (class_id);
-        """,
-        """
-        CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_start_time
-        ON ptsession (trainer_id, start_time);
-        """,
-    ]
+    """Create the required views, capacity counter, and indexes if they do not exist."""
     with engine.begin() as conn:
-        for statement in statements:
-            conn.execute(text(statement))
+        if _extras_installed(conn):
+            return
+        # One multi-statement round trip instead of one per statement.
+        conn.exec_driver_sql(
+            "\n".join(
+                _EXTRAS_STATEMENTS
+                + [f"COMMENT ON VIEW member_dashboard_view IS '{_EXTRAS_VERSION}';"]
+            )
+        )
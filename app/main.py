@@ -2,35 +2,197 @@
 
 from __future__ import annotations
 
+import csv
+import re
+import sys
 from datetime import date, datetime
 from typing import Callable, Optional
 
-from sqlalchemy import select, text
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    Row,
+    String,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session
 
 from models import (
-    ClassRegistration,
     FitnessClass,
     FitnessGoal,
     HealthMetric,
     Invoice,
     Member,
     PTSession,
-    Room,
     Trainer,
     TrainerAvailability,
 )
-from app.db import get_session, init_db
+from app.db import get_readonly_conn, get_session, init_db, refresh_dashboard
 from app.seed import seed_data
 
 DATE_FMT = "%Y-%m-%d"
 DATETIME_FMT = "%Y-%m-%d %H:%M"
+# Precompiled equivalents of the formats above; strptime re-interprets its
+# format string on every call.
+_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_DATETIME_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2}) (\d{1,2}):(\d{1,2})")
+
+
+# ---------------------------------------------------------------------------
+# Reusable SQL statements
+# ---------------------------------------------------------------------------
+# Built once at import so repeated calls reuse the same TextClause and hit
+# SQLAlchemy's compiled-SQL cache.
+def _overlap_exists(owner_column: str) -> str:
+    """SQL EXISTS test for a class or PT session overlapping the given window."""
+    return f"""EXISTS (
+            SELECT 1 FROM fitnessclass
+            WHERE {owner_column} = :{owner_column}
+              AND during && tsrange(:start_time, :end_time)
+              AND class_id IS DISTINCT FROM :exclude_class_id
+            UNION ALL
+            SELECT 1 FROM ptsession
+            WHERE {owner_column} = :{owner_column}
+              AND during && tsrange(:start_time, :end_time)
+              AND session_id IS DISTINCT FROM :exclude_session_id
+        )"""
+
+
+_BOOKING_CONFLICTS_SQL = text(
+    f"""
+    SELECT
+        {_overlap_exists("trainer_id")} AS trainer_conflict,
+        {_overlap_exists("room_id")} AS room_conflict
+    """
+)
+
+_AVAILABILITY_OVERLAP_SQL = text(
+    """
+    SELECT EXISTS (
+        SELECT 1 FROM traineravailability
+        WHERE trainer_id = :trainer_id
+          AND during && tsrange(:start_time, :end_time)
+    )
+    """
+)
+
+_BOOKING_REFS_SQL = text(
+    """
+    SELECT
+        EXISTS (SELECT 1 FROM member WHERE member_id = :member_id) AS member_exists,
+        EXISTS (SELECT 1 FROM trainer WHERE trainer_id = :trainer_id) AS trainer_exists,
+        (SELECT capacity FROM room WHERE room_id = :room_id) AS room_capacity
+    """
+)
+
+# Records the registration only while the class has a free seat. The insert
+# trigger then bumps fitnessclass.current_count; if a concurrent registration
+# took the last seat in the meantime, its CHECK fails with an IntegrityError.
+_REGISTER_SEAT_SQL = text(
+    """
+    INSERT INTO classregistration (member_id, class_id)
+    SELECT :member_id, fc.class_id
+    FROM fitnessclass AS fc
+    WHERE fc.class_id = :class_id AND fc.current_count < fc.max_capacity
+      AND EXISTS (SELECT 1 FROM member WHERE member_id = :member_id)
+      AND NOT EXISTS (
+          SELECT 1 FROM classregistration
+          WHERE member_id = :member_id AND class_id = :class_id
+      )
+    RETURNING registration_id
+    """
+)
+
+_REGISTRATION_STATUS_SQL = text(
+    """
+    SELECT
+        EXISTS (SELECT 1 FROM member WHERE member_id = :member_id) AS member_exists,
+        EXISTS (SELECT 1 FROM fitnessclass WHERE class_id = :class_id) AS class_exists,
+        EXISTS (
+            SELECT 1 FROM classregistration
+            WHERE member_id = :member_id AND class_id = :class_id
+        ) AS already_registered
+    """
+)
+
+_DASHBOARD_SQL = text(
+    """
+    SELECT member_id, full_name, email, phone, goal_type,
+           target_value, target_date, latest_metric_at,
+           weight_kg, heart_rate_bpm, body_fat_percent
+    FROM member_dashboard_mv
+    WHERE member_id = :member_id
+    """
+).columns(
+    member_id=Integer,
+    full_name=String,
+    email=String,
+    phone=String,
+    goal_type=String,
+    target_value=Float,
+    target_date=Date,
+    latest_metric_at=DateTime,
+    weight_kg=Float,
+    heart_rate_bpm=Integer,
+    body_fat_percent=Float,
+)
+
+_MEMBER_LOOKUP_SQL = text(
+    """
+    SELECT member_id, full_name, goal_type, target_value,
+           weight_kg, heart_rate_bpm, latest_metric_at
+    FROM member_dashboard_view
+    WHERE full_name ILIKE :query
+    ORDER BY full_name
+    """
+)
 
 
 # ---------------------------------------------------------------------------
 # Input helpers
 # ---------------------------------------------------------------------------
+def _parse_date(value: str) -> Optional[date]:
+    match = _DATE_RE.fullmatch(value)
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:  # well-formed but out of range, e.g. month 13
+        return None
+
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    match = _DATETIME_RE.fullmatch(value)
+    if not match:
+        return None
+    try:
+        return datetime(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def _csv_datetime(value: Optional[str], default: datetime) -> datetime:
+    value = (value or "").strip()
+    if not value:
+        return default
+    parsed = _parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"{value!r} does not match {DATETIME_FMT}")
+    return parsed
+
+
+def _parse_optional(value: Optional[str], cast: Callable[[str], float]) -> Optional[float]:
+    value = (value or "").strip()
+    return cast(value) if value else None
+
+
 def prompt_required(message: str) -> str:
     while True:
         value = input(message).strip()
@@ -80,19 +242,19 @@ def prompt_date(message: str, allow_blank: bool = True) -> Optional[date]:
         value = input(message).strip()
         if not value and allow_blank:
             return None
-        try:
-            return datetime.strptime(value, DATE_FMT).date()
-        except ValueError:
-            print(f"Use format {DATE_FMT}.")
+        parsed = _parse_date(value)
+        if parsed is not None:
+            return parsed
+        print(f"Use format {DATE_FMT}.")
 
 
 def prompt_datetime(message: str) -> datetime:
     while True:
         value = input(message).strip()
-        try:
-            return datetime.strptime(value, DATETIME_FMT)
-        except ValueError:
-            print(f"Use format {DATETIME_FMT}.")
+        parsed = _parse_datetime(value)
+        if parsed is not None:
+            return parsed
+        print(f"Use format {DATETIME_FMT}.")
 
 
 def prompt_datetime_with_default(message: str, current: datetime) -> datetime:
@@ -100,67 +262,52 @@ def prompt_datetime_with_default(message: str, current: datetime) -> datetime:
         value = input(message).strip()
         if not value:
             return current
-        try:
-            return datetime.strptime(value, DATETIME_FMT)
-        except ValueError:
-            print(f"Use format {DATETIME_FMT}.")
+        parsed = _parse_datetime(value)
+        if parsed is not None:
+            return parsed
+        print(f"Use format {DATETIME_FMT}.")
 
 
 # ---------------------------------------------------------------------------
 # Small utility helpers
 # ---------------------------------------------------------------------------
-def trainer_has_conflict(
+def booking_refs(
     session: Session,
     trainer_id: int,
-    start_time: datetime,
-    end_time: datetime,
-    exclude_class_id: Optional[int] = None,
-    exclude_session_id: Optional[int] = None,
-) -> bool:
-    class_stmt = select(FitnessClass.id).where(
-        FitnessClass.trainer_id == trainer_id,
-        FitnessClass.start_time < end_time,
-        FitnessClass.end_time > start_time,
-    )
-    if exclude_class_id:
-        class_stmt = class_stmt.where(FitnessClass.id != exclude_class_id)
-
-    session_stmt = select(PTSession.id).where(
-        PTSession.trainer_id == trainer_id,
-        PTSession.start_time < end_time,
-        PTSession.end_time > start_time,
-    )
-    if exclude_session_id:
-        session_stmt = session_stmt.where(PTSession.id != exclude_session_id)
+    room_id: int,
+    member_id: Optional[int] = None,
+) -> Row:
+    """Validate the ids behind a booking in one round trip.
 
-    return bool(session.scalar(class_stmt) or session.scalar(session_stmt))
+    Returns ``member_exists``, ``trainer_exists`` and ``room_capacity`` (``None``
+    when the room does not exist).
+    """
+    params = {"member_id": member_id, "trainer_id": trainer_id, "room_id": room_id}
+    return session.execute(_BOOKING_REFS_SQL, params).one()
 
 
-def room_has_conflict(
+def booking_conflicts(
     session: Session,
+    trainer_id: int,
     room_id: int,
     start_time: datetime,
     end_time: datetime,
     exclude_class_id: Optional[int] = None,
     exclude_session_id: Optional[int] = None,
-) -> bool:
-    class_stmt = select(FitnessClass.id).where(
-        FitnessClass.room_id == room_id,
-        FitnessClass.start_time < end_time,
-        FitnessClass.end_time > start_time,
-    )
-    if exclude_class_id:
-        class_stmt = class_stmt.where(FitnessClass.id != exclude_class_id)
-
-    session_stmt = select(PTSession.id).where(
-        PTSession.room_id == room_id,
-        PTSession.start_time < end_time,
-        PTSession.end_time > start_time,
-    )
-    if exclude_session_id:
-        session_stmt = session_stmt.where(PTSession.id != exclude_session_id)
-
-    return bool(session.scalar(class_stmt) or session.scalar(session_stmt))
+) -> Row:
+    """Check trainer and room double-bookings in one round trip.
+
+    Returns ``trainer_conflict`` and ``room_conflict`` flags.
+    """
+    params = {
+        "trainer_id": trainer_id,
+        "room_id": room_id,
+        "start_time": start_time,
+        "end_time": end_time,
+        "exclude_class_id": exclude_class_id,
+        "exclude_session_id": exclude_session_id,
+    }
+    return session.execute(_BOOKING_CONFLICTS_SQL, params).one()
 
 
 # ---------------------------------------------------------------------------
@@ -176,20 +323,22 @@ def register_member() -> None:
 
     with get_session() as session:
         try:
-            existing = session.scalar(select(Member).where(Member.email == email))
-            if existing:
-                print("Another member already uses that email.")
-                return
-
-            session.add(
-                Member(
+            member_id = session.execute(
+                pg_insert(Member)
+                .values(
                     full_name=full_name,
                     email=email,
                     phone=phone,
                     date_of_birth=dob,
                     gender=gender,
                 )
-            )
+                .on_conflict_do_nothing(index_elements=[Member.email])
+                .returning(Member.id)
+            ).scalar()
+            if member_id is None:
+                print("Another member already uses that email.")
+                return
+            refresh_dashboard(session)
             session.commit()
             print("Member registered successfully.")
         except Exception as exc:
@@ -228,8 +377,11 @@ def update_profile_and_goal() -> None:
             session.rollback()
             return
 
-        for goal in member.goals:
-            goal.is_active = False
+        session.execute(
+            update(FitnessGoal)
+            .where(FitnessGoal.member_id == member.id, FitnessGoal.is_active.is_(True))
+            .values(is_active=False)
+        )
 
         session.add(
             FitnessGoal(
@@ -241,6 +393,7 @@ def update_profile_and_goal() -> None:
                 is_active=True,
             )
         )
+        refresh_dashboard(session)
         session.commit()
         print("Profile and goal updated.")
 
@@ -266,46 +419,84 @@ def add_health_metric() -> None:
                 recorded_at=datetime.now(),
             )
         )
+        refresh_dashboard(session)
         session.commit()
         print("Metric recorded.")
 
 
+def bulk_add_metrics() -> None:
+    print("\n--- Bulk Import Health Metrics ---")
+    print("CSV columns: member_id, recorded_at, weight_kg, heart_rate_bpm, body_fat_percent")
+    path = prompt_required("CSV path: ")
+    now = datetime.now()
+
+    try:
+        with open(path, newline="") as handle:
+            rows = [
+                {
+                    "member_id": int(record["member_id"]),
+                    "recorded_at": _csv_datetime(record.get("recorded_at"), now),
+                    "weight_kg": _parse_optional(record.get("weight_kg"), float),
+                    "heart_rate_bpm": _parse_optional(record.get("heart_rate_bpm"), int),
+                    "body_fat_percent": _parse_optional(record.get("body_fat_percent"), float),
+                }
+                for record in csv.DictReader(handle)
+            ]
+    except (OSError, KeyError, TypeError, ValueError) as exc:
+        print(f"Could not read metrics file: {exc}")
+        return
+
+    if not rows:
+        print("No metrics found in file.")
+        return
+
+    with get_session() as session:
+        try:
+            # One executemany for the whole file, in a single transaction.
+            session.execute(insert(HealthMetric), rows)
+            refresh_dashboard(session)
+            session.commit()
+            print(f"Imported {len(rows)} metrics.")
+        except IntegrityError:
+            session.rollback()
+            print("Import failed: every member_id must belong to an existing member.")
+        except DBAPIError as exc:
+            # e.g. a value out of range for its column; nothing was imported.
+            session.rollback()
+            print(f"Import failed: {exc.orig}")
+
+
 def register_for_class() -> None:
     print("\n--- Register for Class ---")
     member_id = prompt_int("Member id: ")
     class_id = prompt_int("Class id: ")
 
     with get_session() as session:
-        member = session.get(Member, member_id)
-        fitness_class = session.get(FitnessClass, class_id)
-        if not member or not fitness_class:
-            print("Member or class not found.")
-            return
-
-        existing = session.scalar(
-            select(ClassRegistration).where(
-                ClassRegistration.member_id == member_id,
-                ClassRegistration.class_id == class_id,
-            )
-        )
-        if existing:
-            print("Member already registered for this class.")
-            return
-
-        session.add(ClassRegistration(member_id=member_id, class_id=class_id))
+        params = {"member_id": member_id, "class_id": class_id}
         try:
-            session.commit()
-            print("Registration completed.")
-        except IntegrityError as exc:
-            session.rollback()
-            message = str(getattr(exc, "orig", exc)).lower()
-            if "class" in message and "full" in message:
-                print("Registration failed: the class is full (trigger enforced).")
-            else:
-                print(f"Registration failed: {exc}")
+            registration_id = session.execute(_REGISTER_SEAT_SQL, params).scalar()
+            if registration_id is not None:
+                session.commit()
+                print("Registration completed.")
+                return
+        except IntegrityError:
+            # Lost a race for the same registration or the last seat; the status
+            # check below reports which.
+            pass
         except Exception as exc:
             session.rollback()
             print(f"Registration failed: {exc}")
+            return
+
+        # Nothing was inserted; only this path pays for working out why.
+        session.rollback()
+        status = session.execute(_REGISTRATION_STATUS_SQL, params).one()
+        if not status.member_exists or not status.class_exists:
+            print("Member or class not found.")
+        elif status.already_registered:
+            print("Member already registered for this class.")
+        else:
+            print("Registration failed: the class is full.")
 
 
 # ---------------------------------------------------------------------------
@@ -327,13 +518,10 @@ def set_trainer_availability() -> None:
             print("Trainer not found.")
             return
 
-        overlap = session.scalar(
-            select(TrainerAvailability).where(
-                TrainerAvailability.trainer_id == trainer_id,
-                TrainerAvailability.start_time < end_time,
-                TrainerAvailability.end_time > start_time,
-            )
-        )
+        overlap = session.execute(
+            _AVAILABILITY_OVERLAP_SQL,
+            {"trainer_id": trainer_id, "start_time": start_time, "end_time": end_time},
+        ).scalar()
         if overlap:
             print("Slot overlaps with an existing availability entry.")
             return
@@ -352,39 +540,47 @@ def view_trainer_schedule() -> None:
     trainer_id = prompt_int("Trainer id: ")
     now = datetime.now()
 
-    with get_session() as session:
-        trainer = session.get(Trainer, trainer_id)
-        if not trainer:
+    with get_readonly_conn() as conn:
+        trainer_name = conn.execute(
+            select(Trainer.full_name).where(Trainer.id == trainer_id)
+        ).scalar()
+        if trainer_name is None:
             print("Trainer not found.")
             return
 
-        pt_sessions = session.scalars(
-            select(PTSession)
+        pt_sessions = conn.execute(
+            select(PTSession.id, PTSession.member_id, PTSession.start_time, PTSession.end_time)
             .where(PTSession.trainer_id == trainer_id, PTSession.start_time >= now)
             .order_by(PTSession.start_time)
         ).all()
-        classes = session.scalars(
-            select(FitnessClass)
+        classes = conn.execute(
+            select(
+                FitnessClass.id,
+                FitnessClass.title,
+                FitnessClass.room_id,
+                FitnessClass.start_time,
+                FitnessClass.end_time,
+            )
             .where(FitnessClass.trainer_id == trainer_id, FitnessClass.start_time >= now)
             .order_by(FitnessClass.start_time)
         ).all()
 
-        print(f"\nUpcoming PT Sessions for {trainer.full_name}:")
+        print(f"\nUpcoming PT Sessions for {trainer_name}:")
         if not pt_sessions:
             print("  (none)")
-        for session_item in pt_sessions:
+        for session_id, member_id, start_time, end_time in pt_sessions:
             print(
-                f"  Session #{session_item.id} with member {session_item.member_id} "
-                f"{session_item.start_time:%Y-%m-%d %H:%M} - {session_item.end_time:%H:%M}"
+                f"  Session #{session_id} with member {member_id} "
+                f"{start_time:%Y-%m-%d %H:%M} - {end_time:%H:%M}"
             )
 
-        print(f"\nUpcoming Classes for {trainer.full_name}:")
+        print(f"\nUpcoming Classes for {trainer_name}:")
         if not classes:
             print("  (none)")
-        for cls in classes:
+        for class_id, title, room_id, start_time, end_time in classes:
             print(
-                f"  Class #{cls.id} '{cls.title}' in room {cls.room_id} "
-                f"{cls.start_time:%Y-%m-%d %H:%M} - {cls.end_time:%H:%M}"
+                f"  Class #{class_id} '{title}' in room {room_id} "
+                f"{start_time:%Y-%m-%d %H:%M} - {end_time:%H:%M}"
             )
 
 
@@ -392,33 +588,23 @@ def lookup_member_info() -> None:
     print("\n--- Lookup Member ---")
     query = prompt_required("Enter part of a member name: ")
 
-    with get_session() as session:
-        members = session.scalars(
-            select(Member).where(Member.full_name.ilike(f"%{query}%")).order_by(Member.full_name)
-        ).all()
-        if not members:
+    with get_readonly_conn() as conn:
+        rows = conn.execute(_MEMBER_LOOKUP_SQL, {"query": f"%{query}%"}).mappings().all()
+        if not rows:
             print("No members found.")
             return
 
-        for member in members:
-            goal = session.scalar(
-                select(FitnessGoal)
-                .where(FitnessGoal.member_id == member.id, FitnessGoal.is_active.is_(True))
-                .order_by(FitnessGoal.id.desc())
-            )
-            metric = session.scalar(
-                select(HealthMetric)
-                .where(HealthMetric.member_id == member.id)
-                .order_by(HealthMetric.recorded_at.desc())
-            )
+        for row in rows:
             goal_desc = (
-                f"{goal.goal_type} → {goal.target_value}" if goal else "No active goal"
+                f"{row['goal_type']} → {row['target_value']}"
+                if row["goal_type"]
+                else "No active goal"
             )
-            if metric:
-                metric_desc = f"Weight {metric.weight_kg}kg, HR {metric.heart_rate_bpm}"
+            if row["latest_metric_at"]:
+                metric_desc = f"Weight {row['weight_kg']}kg, HR {row['heart_rate_bpm']}"
             else:
                 metric_desc = "No recent metrics"
-            print(f"- {member.full_name} (#{member.id}) | {goal_desc} | {metric_desc}")
+            print(f"- {row['full_name']} (#{row['member_id']}) | {goal_desc} | {metric_desc}")
 
 
 # ---------------------------------------------------------------------------
@@ -444,20 +630,23 @@ def manage_fitness_class() -> None:
             if end_time <= start_time:
                 print("End time must be after start time.")
                 return
+            if max_capacity < 1:
+                print("Max capacity must be at least 1.")
+                return
 
-            trainer = session.get(Trainer, trainer_id)
-            room = session.get(Room, room_id)
-            if not trainer or not room:
+            refs = booking_refs(session, trainer_id, room_id)
+            if not refs.trainer_exists or refs.room_capacity is None:
                 print("Trainer or room not found.")
                 return
-            if max_capacity > room.capacity:
+            if max_capacity > refs.room_capacity:
                 print("Max capacity cannot exceed the room capacity.")
                 return
 
-            if trainer_has_conflict(session, trainer_id, start_time, end_time):
+            conflicts = booking_conflicts(session, trainer_id, room_id, start_time, end_time)
+            if conflicts.trainer_conflict:
                 print("Trainer already has a booking in that window.")
                 return
-            if room_has_conflict(session, room_id, start_time, end_time):
+            if conflicts.room_conflict:
                 print("Room already booked in that window.")
                 return
 
@@ -504,26 +693,44 @@ def manage_fitness_class() -> None:
             fitness_class.max_capacity,
         )
 
-        trainer = session.get(Trainer, trainer_id)
-        room = session.get(Room, room_id)
-        if not trainer or not room:
-            print("Trainer or room not found.")
-            return
-        if max_capacity > room.capacity:
-            print("Max capacity cannot exceed the room capacity.")
-            return
         if end_time <= start_time:
             print("End time must be after start time.")
             return
+        if max_capacity < max(fitness_class.current_count, 1):
+            print(
+                "Max capacity must be at least 1 and cover the "
+                f"{fitness_class.current_count} existing registrations."
+            )
+            return
+
+        # The stored trainer, room and capacity were validated when the class
+        # was saved, so only look them up again when one of them changes.
+        refs_changed = (trainer_id, room_id, max_capacity) != (
+            fitness_class.trainer_id,
+            fitness_class.room_id,
+            fitness_class.max_capacity,
+        )
+        if refs_changed:
+            refs = booking_refs(session, trainer_id, room_id)
+            if not refs.trainer_exists or refs.room_capacity is None:
+                print("Trainer or room not found.")
+                return
+            if max_capacity > refs.room_capacity:
+                print("Max capacity cannot exceed the room capacity.")
+                return
 
-        if trainer_has_conflict(
-            session, trainer_id, start_time, end_time, exclude_class_id=fitness_class.id
-        ):
+        conflicts = booking_conflicts(
+            session,
+            trainer_id,
+            room_id,
+            start_time,
+            end_time,
+            exclude_class_id=fitness_class.id,
+        )
+        if conflicts.trainer_conflict:
             print("Trainer already has a booking in that window.")
             return
-        if room_has_conflict(
-            session, room_id, start_time, end_time, exclude_class_id=fitness_class.id
-        ):
+        if conflicts.room_conflict:
             print("Room already booked in that window.")
             return
 
@@ -553,17 +760,16 @@ def schedule_pt_session() -> None:
         return
 
     with get_session() as session:
-        member = session.get(Member, member_id)
-        trainer = session.get(Trainer, trainer_id)
-        room = session.get(Room, room_id)
-        if not all([member, trainer, room]):
+        refs = booking_refs(session, trainer_id, room_id, member_id=member_id)
+        if not (refs.member_exists and refs.trainer_exists and refs.room_capacity is not None):
             print("Invalid member, trainer, or room id.")
             return
 
-        if trainer_has_conflict(session, trainer_id, start_time, end_time):
+        conflicts = booking_conflicts(session, trainer_id, room_id, start_time, end_time)
+        if conflicts.trainer_conflict:
             print("Trainer already booked.")
             return
-        if room_has_conflict(session, room_id, start_time, end_time):
+        if conflicts.room_conflict:
             print("Room already booked.")
             return
 
@@ -628,19 +834,8 @@ def view_member_dashboard() -> None:
     print("\n--- Member Dashboard ---")
     member_id = prompt_int("Member id: ")
 
-    with get_session() as session:
-        result = session.execute(
-            text(
-                """
-                SELECT member_id, full_name, email, phone, goal_type,
-                       target_value, target_date, latest_metric_at,
-                       weight_kg, heart_rate_bpm, body_fat_percent
-                FROM member_dashboard_view
-                WHERE member_id = :member_id
-                """
-            ),
-            {"member_id": member_id},
-        ).mappings().first()
+    with get_readonly_conn() as conn:
+        result = conn.execute(_DASHBOARD_SQL, {"member_id": member_id}).mappings().first()
 
         if not result:
             print("No information available for that member.")
@@ -672,6 +867,18 @@ def view_member_dashboard() -> None:
 # ---------------------------------------------------------------------------
 # Menus and entry point
 # ---------------------------------------------------------------------------
+_MEMBER_MENU = (
+    "\nMember Menu\n"
+    "1) Register new member\n"
+    "2) Update profile & active goal\n"
+    "3) Add health metric\n"
+    "4) Register for group class\n"
+    "5) View dashboard summary\n"
+    "6) Bulk import health metrics (CSV)\n"
+    "9) Back to main menu\n"
+)
+
+
 def member_menu() -> None:
     actions: dict[str, Callable[[], None]] = {
         "1": register_member,
@@ -679,17 +886,11 @@ def member_menu() -> None:
         "3": add_health_metric,
         "4": register_for_class,
         "5": view_member_dashboard,
+        "6": bulk_add_metrics,
     }
     while True:
-        print(
-            "\nMember Menu\n"
-            "1) Register new member\n"
-            "2) Update profile & active goal\n"
-            "3) Add health metric\n"
-            "4) Register for group class\n"
-            "5) View dashboard summary\n"
-            "9) Back to main menu"
-        )
+        sys.stdout.write(_MEMBER_MENU)
+        sys.stdout.flush()
         choice = input("Select an option: ").strip()
         if choice == "9":
             return
@@ -700,6 +901,15 @@ def member_menu() -> None:
             print("Invalid choice.")
 
 
+_TRAINER_MENU = (
+    "\nTrainer Menu\n"
+    "1) Set availability slot\n"
+    "2) View my schedule\n"
+    "3) Lookup member info\n"
+    "9) Back to main menu\n"
+)
+
+
 def trainer_menu() -> None:
     actions: dict[str, Callable[[], None]] = {
         "1": set_trainer_availability,
@@ -707,13 +917,8 @@ def trainer_menu() -> None:
         "3": lookup_member_info,
     }
     while True:
-        print(
-            "\nTrainer Menu\n"
-            "1) Set availability slot\n"
-            "2) View my schedule\n"
-            "3) Lookup member info\n"
-            "9) Back to main menu"
-        )
+        sys.stdout.write(_TRAINER_MENU)
+        sys.stdout.flush()
         choice = input("Select an option: ").strip()
         if choice == "9":
             return
@@ -724,6 +929,15 @@ def trainer_menu() -> None:
             print("Invalid choice.")
 
 
+_ADMIN_MENU = (
+    "\nAdmin Menu\n"
+    "1) Create or update group class\n"
+    "2) Schedule PT session\n"
+    "3) Create and pay invoice\n"
+    "9) Back to main menu\n"
+)
+
+
 def admin_menu() -> None:
     actions: dict[str, Callable[[], None]] = {
         "1": manage_fitness_class,
@@ -731,13 +945,8 @@ def admin_menu() -> None:
         "3": create_and_pay_invoice,
     }
     while True:
-        print(
-            "\nAdmin Menu\n"
-            "1) Create or update group class\n"
-            "2) Schedule PT session\n"
-            "3) Create and pay invoice\n"
-            "9) Back to main menu"
-        )
+        sys.stdout.write(_ADMIN_MENU)
+        sys.stdout.flush()
         choice = input("Select an option: ").strip()
         if choice == "9":
             return
@@ -748,6 +957,15 @@ def admin_menu() -> None:
             print("Invalid choice.")
 
 
+_MAIN_MENU = (
+    "\nHealth & Fitness Club Management System\n"
+    "1) Member menu\n"
+    "2) Trainer menu\n"
+    "3) Admin menu\n"
+    "9) Quit\n"
+)
+
+
 def main() -> None:
     print("Setting up database...")
     init_db()
@@ -755,19 +973,18 @@ def main() -> None:
     if seed_choice == "y":
         with get_session() as session:
             try:
-                seed_data(session)
+                seed_data(
+                    session,
+                    bulk="--bulk-seed" in sys.argv,
+                    profile="--profile-seed" in sys.argv,
+                )
             except Exception as exc:
                 session.rollback()
                 print(f"Seeding failed: {exc}")
 
     while True:
-        print(
-            "\nHealth & Fitness Club Management System\n"
-            "1) Member menu\n"
-            "2) Trainer menu\n"
-            "3) Admin menu\n"
-            "9) Quit"
-        )
+        sys.stdout.write(_MAIN_MENU)
+        sys.stdout.flush()
         choice = input("Select an option: ").strip()
         if choice == "9":
             print("Goodbye!")
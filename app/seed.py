@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import cProfile
+import pstats
 import random
 from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import Iterable
 
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
 from models import (
     ClassRegistration,
     FitnessClass,
-    FitnessGoal,
     HealthMetric,
     Invoice,
     Member,
@@ -19,153 +23,264 @@ from models import (
     Trainer,
     TrainerAvailability,
 )
+from app.db import refresh_dashboard
 
 
-def seed_data(session: Session) -> None:
-    """Insert a full set of demo data covering every table."""
-    if session.query(Member).first():
-        print("Sample data already exists, skipping seed.")
+_SYNC_SEQUENCES_SQL = text(
+    "SELECT "
+    + ", ".join(
+        f"setval(pg_get_serial_sequence('{table}', '{column}'), "
+        f"(SELECT MAX({column}) FROM {table}))"
+        for table, column in (
+            ("room", "room_id"),
+            ("trainer", "trainer_id"),
+            ("member", "member_id"),
+            ("fitnessclass", "class_id"),
+        )
+    )
+)
+
+
+_HAS_PARENT_ROWS_SQL = text(
+    "SELECT "
+    + " OR ".join(
+        f"EXISTS (SELECT 1 FROM {table})"
+        for table in ("room", "trainer", "member", "fitnessclass")
+    )
+)
+
+
+# Unique constraints a bulk seed drops while loading and rebuilds afterwards.
+# Read from the catalog because their names depend on how the schema was made
+# (create_all vs sql/schema.sql).
+_SEED_UNIQUE_CONSTRAINTS_SQL = text(
+    """
+    SELECT conrelid::regclass::text, quote_ident(conname), pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE contype = 'u'
+      AND conrelid = ANY (ARRAY['classregistration', 'member', 'trainer']::regclass[])
+    ORDER BY conrelid::regclass::text, conname
+    """
+)
+
+_SEED_GOALS_SQL = text(
+    """
+    INSERT INTO fitnessgoal
+        (member_id, goal_type, target_value, start_date, target_date, is_active)
+    SELECT
+        m.member_id,
+        'Goal ' || (j + 1),
+        70.0 + j,
+        :today - (120 - j * 5),
+        :today - (120 - j * 5) + 60,
+        TRUE
+    FROM member AS m
+    CROSS JOIN generate_series(0, 11) AS j
+    ORDER BY m.member_id, j
+    """
+)
+
+
+def _copy_rows(session: Session, model: type, rows: Iterable[dict]) -> None:
+    """Stream ``rows`` into ``model``'s table with COPY FROM STDIN.
+
+    ``rows`` may be a generator; it is consumed one row at a time. COPY skips
+    Python-side column defaults, so rows must spell out every column.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
         return
+    columns = list(first)
+    driver_conn = session.connection().connection.driver_connection
+    with driver_conn.cursor() as cursor:
+        with cursor.copy(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN"
+        ) as copy:
+            for row in chain([first], rows):
+                copy.write_row([row[column] for column in columns])
 
-    random.seed(42)
-    base_datetime = datetime.now().replace(minute=0, second=0, microsecond=0)
-
-    rooms = [
-        Room(name=f"Studio {i}", capacity=20 + (i % 10))
-        for i in range(1, 26)
-    ]
-    session.add_all(rooms)
-    session.flush()
-
-    trainers = [
-        Trainer(
-            full_name=f"Trainer {i}",
-            email=f"trainer{i}@club.com",
-            specialty=random.choice(["Yoga", "Strength", "Cardio", "Pilates"]),
-        )
-        for i in range(1, 26)
-    ]
-    session.add_all(trainers)
-    session.flush()
-
-    members = []
-    for i in range(1, 41):
-        members.append(
-            Member(
-                full_name=f"Member {i}",
-                email=f"member{i}@example.com",
-                phone=f"555-01{i:02d}",
-                date_of_birth=date(1985 + (i % 10), (i % 12) + 1, (i % 27) + 1),
-                gender="Female" if i % 2 == 0 else "Male",
+
+def _load_rows(session: Session, model: type, rows: Iterable[dict], bulk: bool) -> None:
+    """Insert ``rows``, keyed by column name, into ``model``'s table.
+
+    Uses COPY when ``bulk`` is set, streaming generator input straight to the
+    server. Otherwise sends Core ``INSERT ... VALUES (...), (...)`` statements
+    of up to ``insertmanyvalues_page_size`` rows each: one parse and execute
+    per page instead of one per row, and no ORM per-row bookkeeping.
+    """
+    if bulk:
+        _copy_rows(session, model, rows)
+        return
+    rows = list(rows)
+    page_size = session.get_bind().dialect.insertmanyvalues_page_size
+    for start in range(0, len(rows), page_size):
+        session.execute(insert(model.__table__).values(rows[start : start + page_size]))
+
+
+def seed_data(session: Session, bulk: bool = False, profile: bool = False) -> None:
+    """Insert a full set of demo data covering every table.
+
+    Each table is loaded with a multi-row INSERT, except goals, which
+    are generated with INSERT ... SELECT over generate_series. Parent tables get
+    ids 1..N assigned up front so child rows can reference them without
+    reading anything back. With ``bulk`` the INSERT-loaded tables are streamed
+    through COPY instead, and the unique constraints are rebuilt once after
+    loading rather than checked per row. Everything commits together when the
+    ``session.begin()`` block exits. With ``profile`` the run is wrapped in
+    cProfile and the ten most expensive calls by cumulative time are printed.
+    """
+    if not profile:
+        _seed_data(session, bulk)
+        return
+    with cProfile.Profile() as profiler:
+        _seed_data(session, bulk)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(10)
+
+
+def _seed_data(session: Session, bulk: bool) -> None:
+    # Rows go straight to Core inserts, so autoflush has nothing to do.
+    with session.begin(), session.no_autoflush:
+        # Seeded rows use fixed ids, so any existing parent row would collide.
+        if session.execute(_HAS_PARENT_ROWS_SQL).scalar():
+            print("Sample data already exists, skipping seed.")
+            return
+        # Demo data can be regenerated, so don't wait for the WAL flush on commit.
+        session.execute(text("SET LOCAL synchronous_commit = off"))
+        if bulk:
+            # Check uniqueness once at the end instead of on every COPY row.
+            unique_constraints = session.execute(_SEED_UNIQUE_CONSTRAINTS_SQL).all()
+            for table, name, _definition in unique_constraints:
+                session.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {name}"))
+
+        random.seed(42)
+        base_datetime = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+        room_rows = [
+            {"room_id": i, "name": f"Studio {i}", "capacity": 20 + (i % 10)}
+            for i in range(1, 26)
+        ]
+        room_ids = [row["room_id"] for row in room_rows]
+        _load_rows(session, Room, room_rows, bulk)
+
+        specialties = random.choices(["Yoga", "Strength", "Cardio", "Pilates"], k=25)
+        trainer_rows = [
+            {
+                "trainer_id": i,
+                "full_name": f"Trainer {i}",
+                "email": f"trainer{i}@club.com",
+                "specialty": specialties[i - 1],
+            }
+            for i in range(1, 26)
+        ]
+        trainer_ids = [row["trainer_id"] for row in trainer_rows]
+        _load_rows(session, Trainer, trainer_rows, bulk)
+
+        member_rows = []
+        for i in range(1, 41):
+            member_rows.append(
+                {
+                    "member_id": i,
+                    "full_name": f"Member {i}",
+                    "email": f"member{i}@example.com",
+                    "phone": f"555-01{i:02d}",
+                    "date_of_birth": date(1985 + (i % 10), (i % 12) + 1, (i % 27) + 1),
+                    "gender": "Female" if i % 2 == 0 else "Male",
+                }
             )
-        )
-    session.add_all(members)
-    session.flush()
-
-    availability_entries = []
-    for idx, trainer in enumerate(trainers):
-        for slot in range(2):
-            start = base_datetime + timedelta(days=(idx + slot) % 7, hours=6 + slot * 4)
-            availability_entries.append(
-                TrainerAvailability(
-                    trainer_id=trainer.id,
-                    start_time=start,
-                    end_time=start + timedelta(hours=3),
+        member_ids = [row["member_id"] for row in member_rows]
+        _load_rows(session, Member, member_rows, bulk)
+
+        availability_rows = []
+        for idx, trainer_id in enumerate(trainer_ids):
+            for slot in range(2):
+                start = base_datetime + timedelta(days=(idx + slot) % 7, hours=6 + slot * 4)
+                availability_rows.append(
+                    {
+                        "trainer_id": trainer_id,
+                        "start_time": start,
+                        "end_time": start + timedelta(hours=3),
+                    }
                 )
+        _load_rows(session, TrainerAvailability, availability_rows, bulk)
+
+        class_rows = []
+        for i in range(30):
+            room_index = i % len(room_ids)
+            start = base_datetime + timedelta(days=i // 3, hours=6 + (i % 3) * 2)
+            end = start + timedelta(hours=1)
+            max_capacity = min(room_rows[room_index]["capacity"], 10 + (i % 4) * 5)
+            class_rows.append(
+                {
+                    "class_id": i + 1,
+                    "title": f"Class {i + 1}",
+                    "description": f"High energy session #{i + 1}",
+                    "start_time": start,
+                    "end_time": end,
+                    "max_capacity": max_capacity,
+                    "trainer_id": trainer_ids[i % len(trainer_ids)],
+                    "room_id": room_ids[room_index],
+                }
             )
-    session.add_all(availability_entries)
-
-    classes = []
-    for i in range(30):
-        trainer = trainers[i % len(trainers)]
-        room = rooms[i % len(rooms)]
-        start = base_datetime + timedelta(days=i // 3, hours=6 + (i % 3) * 2)
-        end = start + timedelta(hours=1)
-        max_capacity = min(room.capacity, 10 + (i % 4) * 5)
-        classes.append(
-            FitnessClass(
-                title=f"Class {i + 1}",
-                description=f"High energy session #{i + 1}",
-                start_time=start,
-                end_time=end,
-                max_capacity=max_capacity,
-                trainer_id=trainer.id,
-                room_id=room.id,
-            )
+        class_ids = [row["class_id"] for row in class_rows]
+        _load_rows(session, FitnessClass, class_rows, bulk)
+        # The ids above bypassed the serial sequences; move them past the seed.
+        session.execute(_SYNC_SEQUENCES_SQL)
+
+        # Twelve staggered goals per member, generated inside Postgres.
+        session.execute(_SEED_GOALS_SQL, {"today": date.today()})
+
+        metric_times = [base_datetime - timedelta(days=j * 7) for j in range(12)]
+        metric_rows = (
+            {
+                "member_id": member_id,
+                "recorded_at": recorded_at,
+                "weight_kg": 80 - j,
+                "heart_rate_bpm": 70 + (j % 6),
+                "body_fat_percent": 25 - j * 0.2,
+            }
+            for member_id in member_ids[:15]
+            for j, recorded_at in enumerate(metric_times)
         )
-    session.add_all(classes)
-    session.flush()
-
-    goals = []
-    for member in members:
-        for j in range(12):
-            start_date = date.today() - timedelta(days=120 - j * 5)
-            goals.append(
-                FitnessGoal(
-                    member_id=member.id,
-                    goal_type=f"Goal {j + 1}",
-                    target_value=70.0 + j,
-                    start_date=start_date,
-                    target_date=start_date + timedelta(days=60),
-                    is_active=True,
-                )
-            )
-    session.add_all(goals)
-
-    metrics = []
-    for member in members[:15]:
-        for j in range(12):
-            recorded_at = base_datetime - timedelta(days=j * 7)
-            metrics.append(
-                HealthMetric(
-                    member_id=member.id,
-                    recorded_at=recorded_at,
-                    weight_kg=80 - j,
-                    heart_rate_bpm=70 + (j % 6),
-                    body_fat_percent=25 - j * 0.2,
-                )
-            )
-    session.add_all(metrics)
-
-    pt_sessions = []
-    for i in range(24):
-        member = members[i % len(members)]
-        trainer = trainers[i % len(trainers)]
-        room = rooms[(i + 3) % len(rooms)]
-        start = base_datetime + timedelta(days=i, hours=14)
-        pt_sessions.append(
-            PTSession(
-                member_id=member.id,
-                trainer_id=trainer.id,
-                room_id=room.id,
-                start_time=start,
-                end_time=start + timedelta(hours=1),
-                status="COMPLETED" if i % 4 == 0 else "BOOKED",
-            )
+        _load_rows(session, HealthMetric, metric_rows, bulk)
+
+        pt_session_rows = (
+            {
+                "member_id": member_ids[i % len(member_ids)],
+                "trainer_id": trainer_ids[i % len(trainer_ids)],
+                "room_id": room_ids[(i + 3) % len(room_ids)],
+                "start_time": base_datetime + timedelta(days=i, hours=14),
+                "end_time": base_datetime + timedelta(days=i, hours=15),
+                "status": "COMPLETED" if i % 4 == 0 else "BOOKED",
+            }
+            for i in range(24)
         )
-    session.add_all(pt_sessions)
-
-    invoices = []
-    for i, member in enumerate(members[:30], start=1):
-        invoices.append(
-            Invoice(
-                member_id=member.id,
-                amount=50.0 + (i % 6) * 5,
-                description=f"Invoice #{i}",
-                due_at=base_datetime + timedelta(days=30),
-                status="PAID" if i % 3 == 0 else "UNPAID",
-            )
+        _load_rows(session, PTSession, pt_session_rows, bulk)
+
+        due_at = base_datetime + timedelta(days=30)
+        invoice_rows = (
+            {
+                "member_id": member_id,
+                "amount": 50.0 + (i % 6) * 5,
+                "description": f"Invoice #{i}",
+                "due_at": due_at,
+                "status": "PAID" if i % 3 == 0 else "UNPAID",
+            }
+            for i, member_id in enumerate(member_ids[:30], start=1)
         )
-    session.add_all(invoices)
-
-    registrations = []
-    for class_obj in classes[:5]:
-        capacity = class_obj.max_capacity
-        for member in members[:capacity]:
-            registrations.append(
-                ClassRegistration(member_id=member.id, class_id=class_obj.id)
-            )
-    session.add_all(registrations)
+        _load_rows(session, Invoice, invoice_rows, bulk)
+
+        capacities = [row["max_capacity"] for row in class_rows[:5]]
+        registration_rows = [
+            {"member_id": member_id, "class_id": class_id}
+            for class_id, capacity in zip(class_ids[:5], capacities)
+            for member_id in member_ids[:capacity]
+        ]
+        # The classregistration triggers fill in fitnessclass.current_count.
+        _load_rows(session, ClassRegistration, registration_rows, bulk)
 
-    session.commit()
+        if bulk:
+            for table, name, definition in unique_constraints:
+                session.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"))
+        refresh_dashboard(session)
     print("Sample data inserted.")
@@ -11,6 +11,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -34,20 +35,22 @@ class Member(Base):
     date_of_birth: Mapped[Optional[date]] = mapped_column(Date)
     gender: Mapped[Optional[str]] = mapped_column(String(20))
 
+    # The raise_on_sql collections are only read and written through explicit
+    # statements, so an accidental lazy load raises instead of querying.
     goals: Mapped[List["FitnessGoal"]] = relationship(
         back_populates="member", cascade="all, delete-orphan"
     )
     health_metrics: Mapped[List["HealthMetric"]] = relationship(
-        back_populates="member", cascade="all, delete-orphan"
+        back_populates="member", cascade="all, delete-orphan", lazy="raise_on_sql"
     )
     pt_sessions: Mapped[List["PTSession"]] = relationship(
         back_populates="member", cascade="all, delete-orphan"
     )
     class_registrations: Mapped[List["ClassRegistration"]] = relationship(
-        back_populates="member", cascade="all, delete-orphan"
+        back_populates="member", cascade="all, delete-orphan", lazy="raise_on_sql"
     )
     invoices: Mapped[List["Invoice"]] = relationship(
-        back_populates="member", cascade="all, delete-orphan"
+        back_populates="member", cascade="all, delete-orphan", lazy="raise_on_sql"
     )
 
 
@@ -79,6 +82,9 @@ class Room(Base):
 
 class FitnessClass(Base):
     __tablename__ = "fitnessclass"
+    __table_args__ = (
+        Index("idx_fitnessclass_trainer_time", "trainer_id", "start_time", "end_time"),
+    )
 
     id: Mapped[int] = mapped_column("class_id", primary_key=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -86,6 +92,9 @@ class FitnessClass(Base):
     start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     max_capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    current_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     trainer_id: Mapped[int] = mapped_column(ForeignKey("trainer.trainer_id"), nullable=False)
     room_id: Mapped[int] = mapped_column(ForeignKey("room.room_id"), nullable=False)
 
@@ -102,7 +111,9 @@ class ClassRegistration(Base):
 
     id: Mapped[int] = mapped_column("registration_id", primary_key=True)
     member_id: Mapped[int] = mapped_column(ForeignKey("member.member_id"), nullable=False)
-    class_id: Mapped[int] = mapped_column(ForeignKey("fitnessclass.class_id"), nullable=False)
+    class_id: Mapped[int] = mapped_column(
+        ForeignKey("fitnessclass.class_id"), nullable=False, index=True
+    )
     registered_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now()
     )
@@ -113,9 +124,14 @@ class ClassRegistration(Base):
 
 class PTSession(Base):
     __tablename__ = "ptsession"
+    __table_args__ = (
+        Index("idx_ptsession_trainer_start_time", "trainer_id", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column("session_id", primary_key=True)
-    member_id: Mapped[int] = mapped_column(ForeignKey("member.member_id"), nullable=False)
+    member_id: Mapped[int] = mapped_column(
+        ForeignKey("member.member_id"), nullable=False, index=True
+    )
     trainer_id: Mapped[int] = mapped_column(ForeignKey("trainer.trainer_id"), nullable=False)
     room_id: Mapped[int] = mapped_column(ForeignKey("room.room_id"), nullable=False)
     start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -131,7 +147,9 @@ class FitnessGoal(Base):
     __tablename__ = "fitnessgoal"
 
     id: Mapped[int] = mapped_column("goal_id", primary_key=True)
-    member_id: Mapped[int] = mapped_column(ForeignKey("member.member_id"), nullable=False)
+    member_id: Mapped[int] = mapped_column(
+        ForeignKey("member.member_id"), nullable=False, index=True
+    )
     goal_type: Mapped[str] = mapped_column(String(100), nullable=False)
     target_value: Mapped[float] = mapped_column(Float, nullable=False)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -158,6 +176,9 @@ class HealthMetric(Base):
 
 class TrainerAvailability(Base):
     __tablename__ = "traineravailability"
+    __table_args__ = (
+        Index("idx_traineravailability_trainer_start", "trainer_id", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column("availability_id", primary_key=True)
     trainer_id: Mapped[int] = mapped_column(ForeignKey("trainer.trainer_id"), nullable=False)
@@ -171,7 +192,9 @@ class Invoice(Base):
     __tablename__ = "invoice"
 
     id: Mapped[int] = mapped_column("invoice_id", primary_key=True)
-    member_id: Mapped[int] = mapped_column(ForeignKey("member.member_id"), nullable=False)
+    member_id: Mapped[int] = mapped_column(
+        ForeignKey("member.member_id"), nullable=False, index=True
+    )
     amount: Mapped[float] = mapped_column(Float, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(255))
     issued_at: Mapped[datetime] = mapped_column(
@@ -1,10 +1,13 @@
 -- extras.sql
--- VIEW, TRIGGER FUNCTION, TRIGGER, and INDEX statements
+-- VIEW, MATERIALIZED VIEW, COLUMN, TRIGGER FUNCTION, TRIGGER, and INDEX statements
 
 -- =============================================================================
 -- VIEW: Member Dashboard View
 -- Shows each member with their active goal and latest health metric
 -- =============================================================================
+-- Rebuilt below so the snapshot tracks the view's columns
+DROP MATERIALIZED VIEW IF EXISTS member_dashboard_mv;
+
 CREATE OR REPLACE VIEW MemberDashboardView AS
 SELECT
     m.member_id,
@@ -22,7 +25,7 @@ FROM Member m
 LEFT JOIN LATERAL (
     SELECT goal_type, target_value, target_date
     FROM FitnessGoal
-    WHERE member_id = m.member_id AND is_active IS TRUE
+    WHERE member_id = m.member_id AND is_active
     ORDER BY target_date DESC, goal_id DESC
     LIMIT 1
 ) AS goal ON TRUE
@@ -35,60 +38,181 @@ LEFT JOIN LATERAL (
 ) AS metric ON TRUE;
 
 -- =============================================================================
--- TRIGGER FUNCTION: Check Class Capacity
--- Prevents registration if class is already full
+-- MATERIALIZED VIEW: Member Dashboard Snapshot
+-- The CLI dashboard reads this; every CLI write that changes it runs
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY member_dashboard_mv;
+-- before committing. The unique index is what allows CONCURRENTLY.
 -- =============================================================================
-CREATE OR REPLACE FUNCTION check_class_capacity()
-RETURNS TRIGGER AS $$
-DECLARE
-    current_count INTEGER;
-    capacity INTEGER;
-BEGIN
-    SELECT COUNT(*) INTO current_count
-    FROM ClassRegistration
-    WHERE class_id = NEW.class_id;
+CREATE MATERIALIZED VIEW member_dashboard_mv AS
+SELECT * FROM MemberDashboardView;
 
-    SELECT max_capacity INTO capacity
-    FROM FitnessClass
-    WHERE class_id = NEW.class_id;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mdv_member
+ON member_dashboard_mv (member_id);
 
-    IF capacity IS NULL THEN
-        RAISE EXCEPTION 'Class % does not exist', NEW.class_id;
-    END IF;
+-- =============================================================================
+-- COLUMN: Registered seat counter on FitnessClass
+-- Replaces the old COUNT(*) capacity trigger (check_class_capacity)
+-- =============================================================================
+DROP TRIGGER IF EXISTS trg_check_class_capacity ON ClassRegistration;
+DROP FUNCTION IF EXISTS check_class_capacity();
+
+ALTER TABLE FitnessClass
+ADD COLUMN IF NOT EXISTS current_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE FitnessClass AS fc
+SET current_count = counts.registered
+FROM (
+    SELECT f.class_id, COUNT(cr.class_id) AS registered
+    FROM FitnessClass AS f
+    LEFT JOIN ClassRegistration AS cr ON cr.class_id = f.class_id
+    GROUP BY f.class_id
+) AS counts
+WHERE fc.class_id = counts.class_id
+  AND fc.current_count <> counts.registered;
 
-    IF current_count >= capacity THEN
-        RAISE EXCEPTION 'Class % is full', NEW.class_id;
+-- A full class cannot take another registration
+ALTER TABLE FitnessClass
+DROP CONSTRAINT IF EXISTS ck_fitnessclass_current_count;
+
+ALTER TABLE FitnessClass
+ADD CONSTRAINT ck_fitnessclass_current_count
+CHECK (current_count >= 0 AND current_count <= max_capacity) NOT VALID;
+
+-- =============================================================================
+-- TRIGGER FUNCTION: Sync Class Seat Counter
+-- Adds/removes the registrations of each statement to FitnessClass.current_count
+-- =============================================================================
+CREATE OR REPLACE FUNCTION sync_class_current_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE FitnessClass AS fc
+        SET current_count = fc.current_count + added.registered
+        FROM (
+            SELECT class_id, COUNT(*) AS registered
+            FROM new_registrations
+            GROUP BY class_id
+        ) AS added
+        WHERE fc.class_id = added.class_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE FitnessClass AS fc
+        SET current_count = fc.current_count - removed.registered
+        FROM (
+            SELECT class_id, COUNT(*) AS registered
+            FROM old_registrations
+            GROUP BY class_id
+        ) AS removed
+        WHERE fc.class_id = removed.class_id;
+    ELSE
+        -- UPDATE: apply the net change per class (zero unless class_id moved)
+        UPDATE FitnessClass AS fc
+        SET current_count = fc.current_count + moved.registered
+        FROM (
+            SELECT class_id, SUM(change) AS registered
+            FROM (
+                SELECT class_id, 1 AS change FROM new_registrations
+                UNION ALL
+                SELECT class_id, -1 AS change FROM old_registrations
+            ) AS changes
+            GROUP BY class_id
+            HAVING SUM(change) <> 0
+        ) AS moved
+        WHERE fc.class_id = moved.class_id;
     END IF;
 
-    RETURN NEW;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
 -- =============================================================================
--- TRIGGER: Apply capacity check before inserting a class registration
+-- TRIGGERS: Keep the counter in step with every insert, update, and delete
 -- =============================================================================
-DROP TRIGGER IF EXISTS trg_check_class_capacity ON ClassRegistration;
+DROP TRIGGER IF EXISTS trg_classregistration_count_insert ON ClassRegistration;
+
+CREATE TRIGGER trg_classregistration_count_insert
+AFTER INSERT ON ClassRegistration
+REFERENCING NEW TABLE AS new_registrations
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_class_current_count();
+
+DROP TRIGGER IF EXISTS trg_classregistration_count_delete ON ClassRegistration;
 
-CREATE TRIGGER trg_check_class_capacity
-BEFORE INSERT ON ClassRegistration
-FOR EACH ROW
-EXECUTE FUNCTION check_class_capacity();
+CREATE TRIGGER trg_classregistration_count_delete
+AFTER DELETE ON ClassRegistration
+REFERENCING OLD TABLE AS old_registrations
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_class_current_count();
+
+DROP TRIGGER IF EXISTS trg_classregistration_count_update ON ClassRegistration;
+
+-- Transition tables cannot be combined with UPDATE OF class_id
+CREATE TRIGGER trg_classregistration_count_update
+AFTER UPDATE ON ClassRegistration
+REFERENCING OLD TABLE AS old_registrations NEW TABLE AS new_registrations
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_class_current_count();
 
 -- =============================================================================
 -- INDEXES: Improve query performance
 -- =============================================================================
-CREATE INDEX IF NOT EXISTS idx_classregistration_class_id
+CREATE INDEX IF NOT EXISTS ix_classregistration_class_id
 ON ClassRegistration (class_id);
 
+CREATE INDEX IF NOT EXISTS ix_ptsession_member_id
+ON PTSession (member_id);
+
+CREATE INDEX IF NOT EXISTS ix_fitnessgoal_member_id
+ON FitnessGoal (member_id);
+
+CREATE INDEX IF NOT EXISTS ix_invoice_member_id
+ON Invoice (member_id);
+
 CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_start_time
 ON PTSession (trainer_id, start_time);
 
-CREATE INDEX IF NOT EXISTS idx_fitnessgoal_member_active
-ON FitnessGoal (member_id, is_active);
+-- Match the ORDER BY ... LIMIT 1 lookups in MemberDashboardView
+DROP INDEX IF EXISTS idx_fitnessgoal_member_active;
 
-CREATE INDEX IF NOT EXISTS idx_healthmetric_member_recorded
-ON HealthMetric (member_id, recorded_at DESC);
+CREATE INDEX IF NOT EXISTS idx_fitnessgoal_member_active_target
+ON FitnessGoal (member_id, is_active, target_date DESC, goal_id DESC)
+WHERE is_active;
+
+DROP INDEX IF EXISTS idx_healthmetric_member_recorded;
+
+CREATE INDEX IF NOT EXISTS idx_healthmetric_member_recorded_id
+ON HealthMetric (member_id, recorded_at DESC, metric_id DESC);
 
 CREATE INDEX IF NOT EXISTS idx_invoice_member_status
 ON Invoice (member_id, status);
 
+-- =============================================================================
+-- COLUMNS + GiST INDEXES: Schedule overlap checks
+-- Stored [start_time, end_time) ranges so overlap checks can use && against
+-- GiST indexes; btree_gist lets the owner id share the index
+-- =============================================================================
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE TrainerAvailability ADD COLUMN IF NOT EXISTS during TSRANGE
+GENERATED ALWAYS AS (tsrange(start_time, end_time)) STORED;
+
+ALTER TABLE FitnessClass ADD COLUMN IF NOT EXISTS during TSRANGE
+GENERATED ALWAYS AS (tsrange(start_time, end_time)) STORED;
+
+ALTER TABLE PTSession ADD COLUMN IF NOT EXISTS during TSRANGE
+GENERATED ALWAYS AS (tsrange(start_time, end_time)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_traineravailability_trainer_during
+ON TrainerAvailability USING GIST (trainer_id, during);
+
+CREATE INDEX IF NOT EXISTS idx_fitnessclass_trainer_during
+ON FitnessClass USING GIST (trainer_id, during);
+
+CREATE INDEX IF NOT EXISTS idx_fitnessclass_room_during
+ON FitnessClass USING GIST (room_id, during);
+
+CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_during
+ON PTSession USING GIST (trainer_id, during);
+
+CREATE INDEX IF NOT EXISTS idx_ptsession_room_during
+ON PTSession USING GIST (room_id, during);
+